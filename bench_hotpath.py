@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк горячего пути: чтение пользователя через ORM против Core-снимка
+
+Сравнивает поиск пользователя, проверку бана и чтение баланса, а также полный
+апдейт (кнопка «Мой профиль») через диспетчер с мидлварями. Бот не ходит
+в Telegram: запросы Bot API подменяются заглушкой. БД — временный файл SQLite.
+
+Использование:
+    python bench_hotpath.py [--users 1000] [--iterations 3000]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def measure(func, iterations: int) -> dict:
+    """Время на вызов (медиана по 5 прогонам) и пик памяти на вызов"""
+    func()  # прогрев: компиляция запроса, пул соединений
+    samples = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - started) / iterations)
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(iterations, 200)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        func()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return {'us': statistics.median(samples) * 1e6, 'peak': statistics.median(peaks)}
+
+
+def measure_async(loop, make_coro, iterations: int) -> dict:
+    """То же для корутины (полный апдейт через диспетчер)"""
+    return measure(lambda: loop.run_until_complete(make_coro()), iterations)
+
+
+def print_row(name: str, orm: dict, core: dict):
+    print(f"{name:<26} {orm['us']:>9.1f} {core['us']:>9.1f} {orm['us'] / core['us']:>6.1f}x "
+          f"{orm['peak'] / 1024:>9.1f} {core['peak'] / 1024:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORM против Core-снимков на горячем пути")
+    parser.add_argument('--users', type=int, default=1000, help="сколько пользователей в БД")
+    parser.add_argument('--iterations', type=int, default=3000, help="повторов на замер")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bot.db')}"
+    os.environ.setdefault('BOT_TOKEN', '123456:bench')
+    os.environ['TRACE_SAMPLE_RATE'] = '0'
+    os.environ['WATCHDOG_ENABLED'] = '0'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import main as app
+    from aiogram.types import Update
+
+    app.create_app()
+    app.flood_guard.enabled = False
+    # Лимиты Bot API замеряют Telegram, а не обработку апдейта
+    app.outbound.rate = app.outbound.chat_rate = app.outbound.group_rate = 1e9
+    app.outbound.chat_burst = 10 ** 9
+
+    async def fake_make_request(bot, method, timeout=None):
+        return True
+    app.bot.session.make_request = fake_make_request
+
+    for user_id in range(1, args.users + 1):
+        app.Database.register_user(user_id, f"user{user_id}", None)
+    user_id = args.users // 2
+    Database = app.Database
+
+    def orm_lookup():
+        user = Database.get_user(user_id)
+        return user.is_banned, user.balance
+
+    def core_lookup():
+        user = Database.get_user_snapshot(user_id)
+        return user.is_banned, user.balance
+
+    def orm_balance():
+        return Database.get_user(user_id).balance
+
+    def core_balance():
+        return Database.get_balance(user_id)
+
+    counter = [0]
+
+    def profile_update():
+        counter[0] += 1
+        return app.dp.feed_update(app.bot, Update.model_validate({'update_id': counter[0], 'message': {
+            'message_id': counter[0], 'date': 0, 'chat': {'id': user_id, 'type': 'private'},
+            'from': {'id': user_id, 'is_bot': False, 'first_name': 'x', 'username': f"user{user_id}"},
+            'text': app.MENU_BUTTONS[app.DEFAULT_LOCALE]['profile'],
+        }}, context={'bot': app.bot}))
+
+    results = [
+        ('пользователь + бан', measure(orm_lookup, args.iterations), measure(core_lookup, args.iterations)),
+        ('баланс', measure(orm_balance, args.iterations), measure(core_balance, args.iterations)),
+    ]
+
+    # Полный апдейт: мидлвари с ORM-чтением против текущих снимков
+    update_iterations = max(1, args.iterations // 5)
+    loop = asyncio.new_event_loop()
+    core_update = measure_async(loop, profile_update, update_iterations)
+    snapshot_lookup = Database.get_user_snapshot
+    Database.get_user_snapshot = staticmethod(Database.get_user)
+    try:
+        orm_update = measure_async(loop, profile_update, update_iterations)
+    finally:
+        Database.get_user_snapshot = snapshot_lookup
+        loop.close()
+    results.append(('апдейт «Мой профиль»', orm_update, core_update))
+
+    orm_user = Database.get_user(user_id)
+    snapshot = Database.get_user_snapshot(user_id)
+    orm_size = sys.getsizeof(orm_user) + sys.getsizeof(orm_user.__dict__) + sys.getsizeof(app.inspect(orm_user))
+    snapshot_size = sys.getsizeof(snapshot)
+
+    print(f"Пользователей: {args.users}, повторов: {args.iterations}\n")
+    print(f"{'операция':<26} {'ORM, мкс':>9} {'Core, мкс':>9} {'выигр.':>7} {'ORM, КБ':>9} {'Core, КБ':>9}")
+    for name, orm, core in results:
+        print_row(name, orm, core)
+    print("\nКБ — пик памяти на вызов (tracemalloc)")
+    print(f"data['user']: ORM-объект {orm_size} байт, снимок {snapshot_size} байт")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Денежные операции и атомарность на всех поддерживаемых бэкендах"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from main import BulkProcessor, JobLease, Stars, BroadcastSegment, Rollups, SessionLocal, StatsRollup, Transaction, tenants
+
+
+def run_concurrently(func, times: int) -> list:
+    with ThreadPoolExecutor(max_workers=times) as pool:
+        return list(pool.map(lambda _: func(), range(times)))
+
+
+def test_register_user_is_idempotent_and_rewards_referrer_chain(db):
+    db.register_user(1, 'one')
+    db.register_user(2, 'two', referrer_id=1)
+    db.register_user(3, 'three', referrer_id=2)
+    # Повторная регистрация не создает дубль и не награждает еще раз
+    db.register_user(3, 'three', referrer_id=2)
+    
+    tenant = tenants.current()
+    level_two = Stars(int(tenant.referral_reward) * tenant.referral_level_percents[0] // 100)
+    assert db.get_balance(2) == tenant.referral_reward
+    assert db.get_balance(1) == tenant.referral_reward + level_two
+    assert db.get_referrals_count(1) == 1
+    assert db.get_team_size(1) == 2
+
+
+def test_concurrent_debits_never_overdraw(db):
+    db.register_user(1, 'one')
+    db.update_balance(1, Stars.parse('10'))
+    
+    results = run_concurrently(lambda: db.debit_balance(1, Stars.parse('1')), 20)
+    
+    assert sum(1 for result in results if result) == 10
+    assert db.get_balance(1) == Stars(0)
+
+
+def test_daily_bonus_is_claimed_once(db):
+    db.register_user(1, 'one')
+    now = datetime.now()
+    
+    results = run_concurrently(lambda: db.claim_daily_bonus(1, Stars.parse('0.5'), now), 10)
+    
+    assert results.count(True) == 1
+    assert db.get_balance(1) == Stars.parse('0.5')
+
+
+def test_promocode_uses_are_atomic(db):
+    assert db.create_promocode('PROMO', Stars.parse('2'), 3)
+    assert db.create_promocode('PROMO', Stars.parse('2'), 3) is None
+    
+    results = run_concurrently(lambda: db.use_promocode('PROMO'), 10)
+    
+    assert results.count(True) == 3
+    assert db.get_promocode('PROMO') is None
+
+
+def test_amounts_are_exact(db):
+    db.register_user(1, 'one')
+    for _ in range(10):
+        db.update_balance(1, Stars.parse('0.1'))
+        db.create_transaction(None, 1, Stars.parse('0.1'), 'admin_add')
+    
+    assert db.get_balance(1) == Stars.parse('1')
+    assert db.get_stats()['total_balance'] == Stars.parse('1')
+
+
+def test_snapshot_matches_orm_row(db):
+    db.register_user(1, 'one')
+    db.update_balance(1, Stars.parse('8.5'))
+    
+    user = db.get_user(1)
+    snapshot = db.get_user_snapshot(1)
+    
+    assert (snapshot.user_id, snapshot.username, snapshot.balance, snapshot.is_banned) == \
+        (user.user_id, user.username, user.balance, user.is_banned)
+    assert db.get_user_snapshot(2) is None
+
+
+def test_job_lease_is_exclusive(db):
+    first = JobLease('test', "Тест")
+    second = JobLease('test', "Тест")
+    
+    assert first._acquire()
+    assert not second._acquire()
+    assert first._acquire()  # продление своей аренды
+    first._release()
+    assert second._acquire()
+
+
+def test_segment_compiles_to_one_query(db):
+    db.register_user(1, 'one')
+    db.register_user(2, 'two', referrer_id=1)
+    db.register_user(3, 'three', referrer_id=1)
+    db.ban_user(3)
+    
+    segment = BroadcastSegment.parse('referred_by 1')
+    assert db.count_segment(segment) == 1
+    assert db.get_segment_user_ids(segment, 0, 10) == [2]
+    assert db.get_segment_user_ids(BroadcastSegment.parse('has_referrals yes'), 0, 10) == [1]
+
+
+
+def rollup_totals(metric: str) -> tuple:
+    with SessionLocal() as session:
+        row = session.query(StatsRollup).filter(
+            StatsRollup.period == 'day', StatsRollup.metric == metric
+        ).one_or_none()
+        return (row.count, row.amount) if row else (0, Stars(0))
+
+
+def test_rollups_count_one_referral_per_signup(db):
+    db.register_user(1, 'one')
+    db.register_user(2, 'two', referrer_id=1)
+    db.register_user(3, 'three', referrer_id=2)
+    
+    Rollups().run_once()
+    
+    tenant = tenants.current()
+    level_two = Stars(int(tenant.referral_reward) * tenant.referral_level_percents[0] // 100)
+    assert rollup_totals('referrals') == (2, tenant.referral_reward * 2 + level_two)
+    assert rollup_totals('new_users')[0] == 3
+
+
+def test_rollups_pick_up_rows_committed_after_a_higher_id(db):
+    db.register_user(1, 'one')
+    now = datetime.now()
+    with SessionLocal() as session:
+        session.add(Transaction(id=5, receiver_id=1, amount=Stars.parse('1'), type='bonus', timestamp=now))
+        session.commit()
+    rollups = Rollups()
+    rollups.run_once()
+    assert rollup_totals('bonuses')[0] == 1
+    
+    # Строка с меньшим id закоммитилась после прохода
+    with SessionLocal() as session:
+        session.add(Transaction(id=3, receiver_id=1, amount=Stars.parse('2'), type='bonus', timestamp=now))
+        session.commit()
+    rollups.run_once()
+    rollups.run_once()
+    
+    assert rollup_totals('bonuses') == (2, Stars.parse('3'))
+
+
+def test_bulk_chunk_debits_every_row_or_rejects_overdraft(db):
+    db.register_user(1, 'one')
+    db.register_user(2, 'two')
+    db.update_balance(1, Stars.parse('5'))
+    rows = [
+        (2, 1, 'remove', Stars.parse('3'), None),
+        (3, 2, 'remove', Stars.parse('1'), None),
+        (4, 2, 'add', Stars.parse('4'), None),
+        (5, 9, 'add', Stars.parse('1'), None),
+    ]
+    
+    results, notifications = BulkProcessor()._apply_chunk(rows, admin_id=0)
+    
+    assert [result[-1] for result in results] == ['ok', 'insufficient_funds', 'ok', 'user_not_found']
+    assert db.get_balance(1) == Stars.parse('2')
+    assert db.get_balance(2) == Stars.parse('4')
+    assert len(notifications) == 2
@@ -0,0 +1,42 @@
+"""Арифметика сумм в милли-звёздах"""
+
+from decimal import Decimal
+
+import pytest
+
+from main import Stars
+
+
+def test_division_keeps_units_and_rounds():
+    assert Stars.parse('1.5') / 2 == Stars.parse('0.75')
+    assert isinstance(Stars.parse('1.5') / 2, Stars)
+    assert Stars.parse('2') / 3 == Stars.parse('0.667')
+    assert Stars.parse('-1') / 3 == Stars.parse('-0.333')
+    assert Stars.parse('1.5') / Stars.parse('0.5') == Decimal(3)
+
+
+def test_floor_division():
+    assert Stars.parse('1.5') // 2 == Stars.parse('0.75')
+    assert Stars.parse('1') // 3 == Stars.parse('0.333')
+    assert Stars.parse('1.5') // Stars.parse('0.4') == 3
+
+
+def test_multiplication_rounds_explicitly():
+    assert Stars.parse('8.5') * 0.2 == Stars.parse('1.7')
+    assert Stars.parse('0.001') * 0.5 == Stars.parse('0.001')
+    assert Stars.parse('1') * Decimal('0.3333') == Stars.parse('0.333')
+    assert 3 * Stars.parse('1') == Stars.parse('3')
+
+
+@pytest.mark.parametrize('operation', [
+    lambda: Stars.parse('1') * Stars.parse('1'),
+    lambda: 2 / Stars.parse('1'),
+    lambda: Stars.parse('1') / 'x',
+    lambda: Stars.parse('1') + 0.5,
+    lambda: Stars.parse('1') + Decimal('0.5'),
+    lambda: Stars.parse('1') - 0.9,
+    lambda: Stars.parse('1') + '1',
+])
+def test_meaningless_operations_raise(operation):
+    with pytest.raises(TypeError):
+        operation()
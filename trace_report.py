@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Отчет по трассам бота: самые медленные апдейты и сводка по спанам
+
+Использование:
+    python trace_report.py [traces.jsonl] [--top 10] [--handler process_withdraw]
+"""
+
+import argparse
+import glob
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List
+
+
+def iter_traces(path: str) -> Iterator[Dict[str, Any]]:
+    """Читает трассы из файла и его ротированных копий (.1, .2, ...)"""
+    rotated = [p for p in glob.glob(f"{path}.*") if p.rsplit('.', 1)[-1].isdigit()]
+    files = [path] + sorted(rotated, key=lambda p: int(p.rsplit('.', 1)[-1]))
+    for file_path in files:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def handler_name(trace: Dict[str, Any]) -> str:
+    """Имя хендлера, обработавшего апдейт"""
+    for span in trace['spans']:
+        if span['name'] == 'handler':
+            return span.get('attrs', {}).get('handler', '-')
+    return '-'
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по отсортированному списку"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[index]
+
+
+def format_spans(trace: Dict[str, Any]) -> str:
+    """Дерево спанов трассы с отступами по вложенности"""
+    depth = {}
+    lines = []
+    for span in trace['spans']:
+        level = depth.get(span['parent'], -1) + 1
+        depth[span['id']] = level
+        attrs = span.get('attrs', {})
+        detail = ' '.join(f"{k}={v}" for k, v in attrs.items())
+        lines.append(f"{'    ' * (level + 1)}{span['name']:<10} {span['duration_ms'] or 0:>9.2f} мс  {detail}".rstrip())
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Самые медленные трассы бота")
+    parser.add_argument('path', nargs='?', default=os.getenv('TRACE_FILE', 'traces.jsonl'))
+    parser.add_argument('--top', type=int, default=10, help="сколько трасс показать")
+    parser.add_argument('--handler', help="только трассы указанного хендлера")
+    args = parser.parse_args()
+
+    traces = []
+    by_span = defaultdict(list)
+    for trace in iter_traces(args.path):
+        if args.handler and handler_name(trace) != args.handler:
+            continue
+        traces.append(trace)
+        for span in trace['spans']:
+            key = span['name']
+            if key == 'handler':
+                key = f"handler:{span.get('attrs', {}).get('handler', '-')}"
+            elif key == 'api':
+                key = f"api:{span.get('attrs', {}).get('method', '-')}"
+            by_span[key].append(span['duration_ms'] or 0.0)
+
+    if not traces:
+        print("Трассы не найдены")
+        return
+
+    print(f"Трасс: {len(traces)}\n")
+    print(f"{'спан':<40} {'кол-во':>8} {'p50, мс':>10} {'p95, мс':>10} {'max, мс':>10}")
+    for key, values in sorted(by_span.items(), key=lambda kv: -sum(kv[1])):
+        values.sort()
+        print(f"{key:<40} {len(values):>8} {percentile(values, 0.5):>10.2f} "
+              f"{percentile(values, 0.95):>10.2f} {values[-1]:>10.2f}")
+
+    print(f"\nСамые медленные трассы (топ {args.top}):\n")
+    for trace in sorted(traces, key=lambda t: t['duration_ms'], reverse=True)[:args.top]:
+        print(f"{trace['duration_ms']:>9.2f} мс  {trace['trace_id']}  {trace['timestamp']}  {trace['update']}")
+        print(format_spans(trace))
+        print()
+
+
+if __name__ == "__main__":
+    main()